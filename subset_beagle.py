@@ -13,20 +13,34 @@ import sys
 import gzip
 import os
 import argparse
+import mmap
+import selectors
+import shlex
+import shutil
+import signal
 import subprocess
 import tempfile
-from typing import Set, List, Tuple
+from functools import lru_cache
+from operator import itemgetter
+from typing import Iterator, Set, List, Optional, Tuple
 
-def read_sample_list(sample_list_file: str) -> Set[str]:
-    """Read sample IDs from a text file (one per line, no header)"""
+# highest field number BSD cut accepts in a -f list (_POSIX2_LINE_MAX)
+CUT_LINE_MAX = 2048
+
+# block size read at a time by the in-process engine
+CHUNK_SIZE = 8 * 1024 * 1024
+
+def read_sample_list(sample_list_file: str) -> Set[bytes]:
+    """Read raw sample IDs from a text file (one per line, no header)"""
     samples = set()
     
     try:
-        with open(sample_list_file, 'r') as f:
-            for line in f:
-                sample_id = line.strip()
-                if sample_id:  # Skip empty lines
-                    samples.add(sample_id)
+        with open(sample_list_file, 'rb') as f:
+            # mmap refuses empty files, which simply have no samples
+            if os.fstat(f.fileno()).st_size > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    samples = {line.strip() for line in mm[:].splitlines()}
+                samples.discard(b'')  # Skip empty lines
     except FileNotFoundError:
         print(f"Error: Sample list file '{sample_list_file}' not found.")
         sys.exit(1)
@@ -40,14 +54,37 @@ def read_sample_list(sample_list_file: str) -> Set[str]:
     
     return samples
 
-def read_header(input_file: str) -> str:
-    """Read the header line from a Beagle file (handles gzipped files)"""
+def decode_samples(samples: Set[bytes]) -> List[str]:
+    """Decode raw sample IDs into a sorted list for reporting"""
+    return sorted(sample_id.decode('utf-8', 'replace') for sample_id in samples)
+
+def read_header(input_file: str) -> bytes:
+    """Read the raw header line from a Beagle file (handles gzipped files)"""
     try:
         if input_file.endswith('.gz'):
-            with gzip.open(input_file, 'rt', encoding='utf-8') as f:
+            # decompress with an external tool and stop after the first line;
+            # fall back to the gzip module if neither pigz nor zcat exist, or
+            # if the tool failed, so that it raises (and we report) the real error
+            for decompress_cmd in (['pigz', '-cd', input_file], ['zcat', input_file]):
+                try:
+                    process = subprocess.Popen(decompress_cmd, stdout=subprocess.PIPE,
+                                               stderr=subprocess.DEVNULL, bufsize=1 << 20)
+                except FileNotFoundError:
+                    continue
+                line = process.stdout.readline()
+                # a decompressor cut off mid-write dies from SIGTERM or SIGPIPE,
+                # both of which are expected here
+                process.terminate()
+                process.stdout.close()
+                return_code = process.wait()
+                if line and return_code in (0, -signal.SIGTERM, -signal.SIGPIPE):
+                    return line.strip()
+                break
+
+            with gzip.open(input_file, 'rb') as f:
                 return f.readline().strip()
         else:
-            with open(input_file, 'r', encoding='utf-8') as f:
+            with open(input_file, 'rb') as f:
                 return f.readline().strip()
     except FileNotFoundError:
         print(f"Error: Input file '{input_file}' not found.")
@@ -56,43 +93,49 @@ def read_header(input_file: str) -> str:
         print(f"Error reading input file: {e}")
         sys.exit(1)
 
-def find_columns_to_keep(header_line: str, sample_list: Set[str], 
-                        remove_mode: bool) -> Tuple[List[int], Set[str], Set[str]]:
+def find_columns_to_keep(header_line: bytes, sample_list: Set[bytes], remove_mode: bool,
+                        drop_third: bool = False) -> Tuple[List[int], Set[bytes], Optional[Set[bytes]]]:
     """
     Determine which columns to keep based on sample list
     
     Args:
-        header_line: Header line from Beagle file
-        sample_list: Set of sample IDs to keep or remove
+        header_line: Raw header line from Beagle file
+        sample_list: Set of raw sample IDs to keep or remove
         remove_mode: If True, remove samples in list; if False, keep only samples in list
+        drop_third: If True, keep only the first two genotype likelihoods per sample
     
     Returns:
-        Tuple of (column_indices, samples_kept, samples_removed)
+        Tuple of (column_indices, samples_kept, samples_removed); samples_removed
+        is only tracked in remove mode and is None otherwise
     """
-    fields = header_line.split('\t')
+    # work on the raw bytes rather than decoding the whole (very wide) header
+    fields = header_line.split(b'\t')
+    sample_list = frozenset(sample_list)
     
     # always keep the first 3 columns (marker, allele1, allele2)
     columns_to_keep = [1, 2, 3]  # AWK is 1-indexed!
     
     # each sample has 3 columns in Beagle format
-    all_samples = set()
     samples_kept = set()
+    samples_removed = set() if remove_mode else None
     
     for i in range(3, len(fields), 3):
-        if i < len(fields):
-            sample_id = fields[i]
-            all_samples.add(sample_id)
-            
-            # In remove mode: keep if NOT in list
-            # In keep mode: keep if IN list
-            should_keep = (sample_id not in sample_list) if remove_mode else (sample_id in sample_list)
-            
-            if should_keep:
-                # Add all 3 columns for this sample (AWK is 1-indexed, so add 1)
+        sample_id = fields[i]
+        
+        # In remove mode: keep if NOT in list
+        # In keep mode: keep if IN list
+        should_keep = (sample_id not in sample_list) if remove_mode else (sample_id in sample_list)
+        
+        if should_keep:
+            # Add all 3 columns for this sample (AWK is 1-indexed, so add 1);
+            # the third is implied by the other two if they sum to 1
+            if drop_third:
+                columns_to_keep.extend([i+1, i+2])
+            else:
                 columns_to_keep.extend([i+1, i+2, i+3])
-                samples_kept.add(sample_id)
-    
-    samples_removed = all_samples - samples_kept
+            samples_kept.add(sample_id)
+        elif remove_mode:
+            samples_removed.add(sample_id)
     
     # validation
     if not samples_kept:
@@ -101,16 +144,101 @@ def find_columns_to_keep(header_line: str, sample_list: Set[str],
     
     return columns_to_keep, samples_kept, samples_removed
 
-def check_pv_available() -> bool:
-    """Check if pv (Pipe Viewer) is installed"""
+@lru_cache(maxsize=None)
+def find_tool(name: str) -> Optional[str]:
+    """Locate an executable (e.g. pv, pigz, mawk) on PATH without running it"""
+    return shutil.which(name)
+
+@lru_cache(maxsize=None)
+def check_gnu_cut() -> bool:
+    """Check if cut is GNU coreutils cut (no limit on field numbers)"""
+    try:
+        result = subprocess.run(['cut', '--version'], capture_output=True, text=True, check=True)
+        return 'GNU' in result.stdout
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+
+@lru_cache(maxsize=None)
+def check_gnu_parallel() -> bool:
+    """Check if parallel is GNU parallel (moreutils parallel lacks --pipe)"""
     try:
-        subprocess.run(['pv', '--version'], capture_output=True, check=True)
-        return True
+        result = subprocess.run(['parallel', '--version'], capture_output=True, text=True,
+                                check=True, stdin=subprocess.DEVNULL)
+        return 'GNU parallel' in result.stdout
     except (subprocess.CalledProcessError, FileNotFoundError):
         return False
 
+def get_compression_commands() -> Tuple[List[str], List[str]]:
+    """
+    Pick the gzip (de)compression commands, preferring pigz over zcat/gzip
+    
+    Returns:
+        Tuple of (decompress_command, compress_command) as lists of strings
+    """
+    if find_tool('pigz'):
+        # leave half the cores for the projection stage
+        threads = str(max(1, (os.cpu_count() or 2) // 2))
+        return ['pigz', '-cd', '-p', threads], ['pigz', '-p', threads]
+    return ['zcat'], ['gzip']
+
+def get_output_compress_command(output_file: str) -> Optional[List[str]]:
+    """
+    Pick the compression command for the output file from its extension
+    
+    Args:
+        output_file: Output file path (.zst for zstd, .gz for gzip)
+    
+    Returns:
+        Command as list of strings, or None for uncompressed output
+    """
+    if output_file.endswith('.zst'):
+        # zstd compresses several times faster than gzip at a similar ratio
+        return ['zstd', '-T0', '-3', '-q', '-c']
+    if output_file.endswith('.gz'):
+        return get_compression_commands()[1]
+    return None
+
+def get_column_runs(columns: List[int]) -> List[Tuple[int, int]]:
+    """Collapse sorted column indices into (start, end) runs of consecutive columns"""
+    runs = []
+    for col in columns:
+        if runs and col == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], col)
+        else:
+            runs.append((col, col))
+    return runs
+
+def build_awk_script(columns: List[int]) -> str:
+    """
+    Build an AWK script printing the given columns, tab-separated
+    
+    Consecutive columns are printed with a loop instead of listing every
+    field, which keeps the script small when kept samples are contiguous.
+    
+    Args:
+        columns: List of column indices to keep (1-indexed for AWK)
+    
+    Returns:
+        AWK program text
+    """
+    statements = []
+    runs = get_column_runs(columns)
+    for start, end in runs[:-1]:
+        if start == end:
+            statements.append(f'printf "%s\\t",${start}')
+        else:
+            statements.append(f'for(i={start};i<={end};i++)printf "%s\\t",$i')
+    
+    # the last field ends the record
+    start, end = runs[-1]
+    if start != end:
+        statements.append(f'for(i={start};i<{end};i++)printf "%s\\t",$i')
+    statements.append(f'print ${end}')
+    
+    return '{' + '; '.join(statements) + '}'
+
 def generate_awk_command(columns: List[int], input_file: str, output_file: str, 
-                        use_progress: bool = True) -> List[str]:
+                        use_progress: bool = True) -> Tuple[List[List[str]], bool, Optional[str]]:
     """
     Generate the AWK command for subsetting
     
@@ -121,47 +249,341 @@ def generate_awk_command(columns: List[int], input_file: str, output_file: str,
         use_progress: If True and pv is available, show progress bar
     
     Returns:
-        Command as list of strings for subprocess
+        Tuple of (pipeline stages as lists of strings for subprocess, has_pv,
+        awk_script_file); awk_script_file is a temporary file the caller must
+        remove, or None when cut is used
     """
-    # build the AWK print statement
-    # format: print $1, $2, $3, ... sep = "\t"
-    column_refs = ','.join([f'${col}' for col in columns])
-    awk_script = f'{{OFS="\\t"; print {column_refs}}}'
-    
     # determine if files are gzipped
     input_is_gz = input_file.endswith('.gz')
-    output_is_gz = output_file.endswith('.gz') or output_file.endswith('.beagle.gz')
     
     # get file size for progress bar
     file_size = os.path.getsize(input_file)
     
     # check if pv is available
-    has_pv = use_progress and check_pv_available()
-    
-    # build pv command if available
-    if has_pv:
-        pv_cmd = f"pv -p -t -e -r -b -s {file_size}"
+    has_pv = use_progress and find_tool('pv') is not None
+    
+    # build pv command if available (-f: report even though stderr is a pipe)
+    pv_cmd = ['pv', '-f', '-p', '-t', '-e', '-r', '-b', '-s', str(file_size)]
+    
+    # cut walks each line once and emits only the selected fields, so prefer it;
+    # BSD cut refuses field numbers above LINE_MAX, so fall back to AWK there
+    if max(columns) <= CUT_LINE_MAX or check_gnu_cut():
+        col_spec = ','.join(str(start) if start == end else f"{start}-{end}"
+                            for start, end in get_column_runs(columns))
+        project_cmd = ['cut', '-f', col_spec]
+        awk_script_file = None
+    else:
+        # pass the script as a file, since for wide files it can grow past
+        # the argument length limit
+        with tempfile.NamedTemporaryFile('w', suffix='.awk', delete=False) as f:
+            f.write(build_awk_script(columns))
+            awk_script_file = f.name
+        
+        # mawk is considerably faster than gawk for simple field printing
+        awk_cmd = "mawk" if find_tool('mawk') else "awk"
+        project_cmd = [awk_cmd, '-f', awk_script_file]
+        
+        # records are independent, so shard the stream across AWK workers
+        # (-k keeps the output in input order)
+        workers = max(1, (os.cpu_count() or 2) // 2)
+        if workers > 1 and check_gnu_parallel():
+            project_cmd = ['parallel', '--pipe', '--block', '64M', '-k', f'-j{workers}',
+                           shlex.join(project_cmd)]
+    
+    # use pigz for (de)compression if available, zstd for .zst output
+    decompress_cmd = get_compression_commands()[0]
+    compress_cmd = get_output_compress_command(output_file)
+    
+    # build command pipeline: pv input | zcat | tail | cut | gzip >> output
+    # pv reads the file itself so its progress matches the on-disk size;
+    # without pv, skip the stage entirely rather than passing through cat,
+    # so every byte crosses one pipe less; the header has already been
+    # written by write_header, so tail drops it from the stream
+    stages = []
+    if input_is_gz:
+        if has_pv:
+            stages.append(pv_cmd + [input_file])
+            stages.append(decompress_cmd)
+        else:
+            stages.append(decompress_cmd + [input_file])
+        stages.append(['tail', '-n', '+2'])
+    elif has_pv:
+        stages.append(pv_cmd + [input_file])
+        stages.append(['tail', '-n', '+2'])
     else:
-        pv_cmd = "cat"
-    
-    # build command pipeline
-    if input_is_gz and output_is_gz:
-        # zcat input | pv | awk | gzip > output
-        cmd = f"zcat {input_file} | {pv_cmd} | awk '{awk_script}' | gzip > {output_file}"
-    elif input_is_gz and not output_is_gz:
-        # zcat input | pv | awk > output
-        cmd = f"zcat {input_file} | {pv_cmd} | awk '{awk_script}' > {output_file}"
-    elif not input_is_gz and output_is_gz:
-        # pv input | awk | gzip > output
-        cmd = f"{pv_cmd} {input_file} | awk '{awk_script}' | gzip > {output_file}"
+        # tail reads the file itself
+        stages.append(['tail', '-n', '+2', input_file])
+    
+    stages.append(project_cmd)
+    if compress_cmd:
+        stages.append(compress_cmd)
+    
+    return stages, has_pv, awk_script_file
+
+def run_pipeline(stages: List[List[str]], output_file: str, has_pv: bool) -> int:
+    """
+    Run the pipeline stages connected by pipes, appending to the output file
+    
+    The stages are started directly rather than through a shell. pv writes its
+    progress to stderr, which is captured and echoed while the pipeline runs.
+    
+    Each stage is given by absolute path and with close_fds=False so that
+    subprocess launches it with posix_spawn instead of fork + exec; the pipes
+    and files opened here are non-inheritable, so nothing leaks into the stages.
+    
+    Args:
+        stages: Pipeline stages as lists of strings for subprocess
+        output_file: Output file path the last stage writes to
+        has_pv: If True, echo the progress of the pv stage
+    
+    Returns:
+        Return code of the last failing stage (like bash's pipefail), or 0
+    """
+    processes = []
+    with open(output_file, 'ab') as out_file:
+        stdin = None
+        for i, argv in enumerate(stages):
+            is_last = i == len(stages) - 1
+            process = subprocess.Popen(
+                argv,
+                executable=find_tool(argv[0]) or argv[0],
+                stdin=stdin,
+                stdout=out_file if is_last else subprocess.PIPE,
+                stderr=subprocess.PIPE if has_pv and argv[0] == 'pv' else None,
+                bufsize=1 << 20,
+                close_fds=False
+            )
+            # drop our copy of the pipe so only the next stage reads from it
+            if stdin is not None:
+                stdin.close()
+            stdin = process.stdout
+            processes.append(process)
+    
+    # stream pv progress in real-time; pv redraws its status line with
+    # carriage returns, so pass the raw chunks straight through
+    progress = next((process.stderr for process in processes
+                     if process.stderr is not None), None)
+    if progress is not None:
+        sys.stdout.flush()
+        with selectors.DefaultSelector() as selector:
+            selector.register(progress, selectors.EVENT_READ)
+            while True:
+                selector.select()
+                chunk = os.read(progress.fileno(), 4096)
+                if not chunk:
+                    break
+                sys.stdout.buffer.write(chunk)
+                sys.stdout.buffer.flush()
+        progress.close()
+    
+    # wait for completion
+    return_codes = [process.wait() for process in processes]
+    return next((code for code in reversed(return_codes) if code != 0), 0)
+
+def copy_file(input_file: str, output_file: str):
+    """
+    Copy the input file unchanged, letting the kernel move the data
+    
+    Args:
+        input_file: Input Beagle file path
+        output_file: Output file path
+    """
+    try:
+        with open(input_file, 'rb') as src, open(output_file, 'wb') as dst:
+            size = os.fstat(src.fileno()).st_size
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(dst.fileno(), src.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+    except (AttributeError, OSError):
+        # sendfile is missing or cannot write to regular files (e.g. macOS)
+        shutil.copyfile(input_file, output_file)
+
+def write_header(header_line: bytes, columns: List[int], output_file: str):
+    """
+    Write the subset header line, creating or truncating the output file
+    
+    Args:
+        header_line: Raw header line from Beagle file
+        columns: List of column indices to keep (1-indexed for AWK)
+        output_file: Output file path (compressed if it ends with .gz or .zst)
+    """
+    fields = header_line.split(b'\t')
+    header = b'\t'.join([fields[col - 1] for col in columns]) + b'\n'
+    
+    # the data rows are appended later as a separate gzip member or zstd
+    # frame, which readers of either format transparently concatenate
+    if output_file.endswith('.zst'):
+        with open(output_file, 'wb') as f:
+            try:
+                subprocess.run(get_output_compress_command(output_file), input=header,
+                               stdout=f, check=True)
+            except subprocess.CalledProcessError as e:
+                print(f"\nError: zstd failed to compress the header with return code {e.returncode}")
+                sys.exit(1)
+    elif output_file.endswith('.gz'):
+        with gzip.open(output_file, 'wb') as f:
+            f.write(header)
     else:
-        # pv input | awk > output
-        cmd = f"{pv_cmd} {input_file} | awk '{awk_script}' > {output_file}"
+        with open(output_file, 'wb') as f:
+            f.write(header)
+
+def process_chunk(chunk: bytes, keep_cols: List[int], out: bytearray):
+    """
+    Project the kept columns of every line in a chunk into an output buffer
+    
+    Args:
+        chunk: Complete lines from the Beagle file, without the final newline
+        keep_cols: List of column indices to keep (0-indexed)
+        out: Buffer the tab-separated, newline-terminated lines are appended to
+    
+    Raises:
+        ValueError: If a line has fewer columns than the last kept column
+    """
+    # build the field selector once per chunk, and stop splitting each line
+    # after the last kept column (only saves work when the kept columns sit
+    # near the start of the row)
+    select = itemgetter(*keep_cols)
+    max_split = max(keep_cols) + 1
+    
+    # blank lines (e.g. a trailing empty line) are skipped, as cut/AWK output
+    # for them carries no data either
+    lines = [line for line in chunk.split(b'\n') if line]
+    try:
+        rows = [b'\t'.join(select(line.split(b'\t', max_split))) for line in lines]
+    except IndexError:
+        short_line = next(line for line in lines if line.count(b'\t') < max_split - 1)
+        marker = short_line.split(b'\t', 1)[0].decode('utf-8', 'replace')
+        n_columns = short_line.count(b'\t') + 1
+        raise ValueError(f"Line for marker '{marker}' has {n_columns} columns, "
+                         f"expected at least {max_split}") from None
+    
+    if rows:
+        out += b'\n'.join(rows)
+        out += b'\n'
+
+def read_stream_chunks(src) -> Iterator[bytes]:
+    """
+    Yield blocks of complete data lines read from a binary stream
+    
+    Args:
+        src: Binary file object positioned at the start of the Beagle file
+    
+    Yields:
+        Complete lines after the header, without the final newline
+    """
+    src.readline()
+    
+    # carry any partial line over to the next block
+    pending = b''
+    for block in iter(lambda: src.read(CHUNK_SIZE), b''):
+        block = pending + block
+        end = block.rfind(b'\n')
+        if end < 0:
+            pending = block
+            continue
+        yield block[:end]
+        pending = block[end + 1:]
+    
+    # last line may lack a trailing newline
+    if pending:
+        yield pending
+
+def read_mmap_chunks(input_file: str) -> Iterator[bytes]:
+    """
+    Yield blocks of complete data lines from a memory-mapped plain Beagle file
+    
+    Args:
+        input_file: Uncompressed input Beagle file path
+    
+    Yields:
+        Complete lines after the header, without the final newline
+    """
+    with open(input_file, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size = len(mm)
+        # last line may lack a trailing newline
+        data_end = size - 1 if mm[size - 1] == ord('\n') else size
+        
+        header_end = mm.find(b'\n')
+        pos = header_end + 1 if header_end >= 0 else size
+        
+        # extend each block of about CHUNK_SIZE bytes to the next line end
+        while pos < data_end:
+            end = mm.find(b'\n', min(pos + CHUNK_SIZE, data_end), data_end)
+            if end < 0:
+                end = data_end
+            yield mm[pos:end]
+            pos = end + 1
+
+def subset_in_process(columns: List[int], input_file: str, output_file: str) -> int:
+    """
+    Subset the Beagle file in-process instead of through a cut/AWK stage
+    
+    Args:
+        columns: List of column indices to keep (1-indexed, as for AWK)
+        input_file: Input Beagle file path
+        output_file: Output file path
+    
+    Returns:
+        Return code of the first failing (de)compression process, or 0
+    """
+    keep_cols = [col - 1 for col in columns]
+    decompress_argv = get_compression_commands()[0]
+    compress_argv = get_output_compress_command(output_file)
+    processes = []
+    
+    # the header has already been written by write_header
+    with open(output_file, 'ab') as out_file:
+        # compressed input and output go through external (de)compressors,
+        # plain input is memory-mapped and read without any pipe
+        if input_file.endswith('.gz'):
+            reader = subprocess.Popen(decompress_argv + [input_file], stdout=subprocess.PIPE)
+            processes.append(reader)
+            chunks = read_stream_chunks(reader.stdout)
+        else:
+            reader = None
+            chunks = read_mmap_chunks(input_file)
+        
+        if compress_argv:
+            writer = subprocess.Popen(compress_argv, stdin=subprocess.PIPE, stdout=out_file)
+            processes.append(writer)
+            dst = writer.stdin
+        else:
+            dst = out_file
+        
+        out = bytearray()
+        projection_error = None
+        try:
+            for chunk in chunks:
+                process_chunk(chunk, keep_cols, out)
+                dst.write(out)
+                out.clear()
+        except ValueError as e:
+            projection_error = e
+        
+        if reader is not None:
+            reader.stdout.close()
+        if dst is not out_file:
+            dst.close()
+    
+    return_codes = [process.wait() for process in processes]
+    
+    # a truncated or corrupt input shows up as a short last line, so report
+    # a failed decompressor as the cause rather than the malformed line;
+    # SIGPIPE just means we stopped reading early
+    if projection_error is not None:
+        if reader is not None and reader.returncode not in (0, -signal.SIGPIPE):
+            return reader.returncode
+        print(f"\nError: {projection_error}")
+        sys.exit(1)
     
-    return ['bash', '-c', cmd], has_pv
+    return next((code for code in return_codes if code != 0), 0)
 
 def subset_beagle(input_file: str, sample_list_file: str, output_file: str, 
-                  remove_mode: bool = False):
+                  remove_mode: bool = False, engine: str = 'shell', drop_third: bool = False):
     """
     Main function to subset Beagle file using AWK
     
@@ -170,6 +592,8 @@ def subset_beagle(input_file: str, sample_list_file: str, output_file: str,
         sample_list_file: Path to sample list file
         output_file: Path to output file
         remove_mode: If True, remove samples; if False, keep samples
+        engine: 'shell' to run a cut/AWK pipeline, 'python' to project in-process
+        drop_third: If True, drop the third genotype likelihood of each sample
     """
     print("=" * 70)
     print("BEAGLE FILE SUBSETTING (Python + AWK Hybrid)")
@@ -181,9 +605,14 @@ def subset_beagle(input_file: str, sample_list_file: str, output_file: str,
         sys.exit(1)
     
     # add .beagle extension if needed
-    if not output_file.endswith('.beagle') and not output_file.endswith('.beagle.gz'):
+    if not output_file.endswith(('.beagle', '.beagle.gz', '.beagle.zst')):
         output_file = output_file + '.beagle'
     
+    # zstd output needs the zstd tool; check before anything is written
+    if output_file.endswith('.zst') and not find_tool('zstd'):
+        print(f"Error: Install 'zstd' for .zst output (conda install zstd or apt install zstd)")
+        sys.exit(1)
+    
     # read sample list
     print(f"\n[1/4] Reading sample list from: {sample_list_file}")
     sample_list = read_sample_list(sample_list_file)
@@ -192,13 +621,13 @@ def subset_beagle(input_file: str, sample_list_file: str, output_file: str,
     # read header
     print(f"\n[2/4] Reading header from: {input_file}")
     header_line = read_header(input_file)
-    total_samples = (len(header_line.split('\t')) - 3) // 3
+    total_samples = (header_line.count(b'\t') + 1 - 3) // 3
     print(f"      Total samples in file: {total_samples}")
     
     # find columns to keep
     print(f"\n[3/4] Calculating columns to keep...")
     columns_to_keep, samples_kept, samples_removed = find_columns_to_keep(
-        header_line, sample_list, remove_mode
+        header_line, sample_list, remove_mode, drop_third
     )
     
     # report results
@@ -206,55 +635,65 @@ def subset_beagle(input_file: str, sample_list_file: str, output_file: str,
     print(f"      Mode: {mode_str}")
     print(f"      Samples kept: {len(samples_kept)}")
     if remove_mode:
-        removed_found = sample_list & samples_removed
-        removed_not_found = sample_list - samples_removed - samples_kept
-        print(f"      Samples removed: {len(removed_found)}")
+        removed_not_found = sample_list - samples_removed
+        print(f"      Samples removed: {len(samples_removed)}")
         if removed_not_found:
-            print(f"      Warning: Samples not found in file: {sorted(removed_not_found)}")
+            print(f"      Warning: Samples not found in file: {decode_samples(removed_not_found)}")
     else:
         print(f"      Samples in list kept: {len(samples_kept)}")
         not_found = sample_list - samples_kept
         if not_found:
-            print(f"      Warning: Samples not found in file: {sorted(not_found)}")
+            print(f"      Warning: Samples not found in file: {decode_samples(not_found)}")
     
     print(f"      Total columns to extract: {len(columns_to_keep)}")
     
+    # keeping every column in the same format needs no projection at all
+    is_identity = (len(columns_to_keep) == header_line.count(b'\t') + 1
+                   and input_file.endswith('.gz') == output_file.endswith('.gz')
+                   and not output_file.endswith('.zst'))
+    
     # generate and execute AWK command
-    print(f"\n[4/4] Processing file with AWK (streaming mode)...")
+    if is_identity:
+        print(f"\n[4/4] All columns kept, copying file unchanged...")
+    elif engine == 'python':
+        print(f"\n[4/4] Processing file in-process (streaming mode)...")
+    else:
+        print(f"\n[4/4] Processing file with AWK (streaming mode)...")
     print(f"      Input:  {input_file}")
     print(f"      Output: {output_file}")
     
-    cmd, has_pv = generate_awk_command(columns_to_keep, input_file, output_file)
-    
-    if has_pv:
-        print(f"\n      Progress (% data processed, time elapsed, rate):")
+    if is_identity or engine == 'python':
+        cmd, has_pv, awk_script_file = None, False, None
+        print(f"\n      Processing... (this may take a few moments)")
     else:
-        print(f"\n      Note: Install 'pv' for progress bar (conda install pv or apt install pv)")
-        print(f"      Processing... (this may take a few moments)")
-    
-    try:
-        # execute the command
-        # use subprocess.Popen to allow real-time output from pv
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
-        )
+        cmd, has_pv, awk_script_file = generate_awk_command(columns_to_keep, input_file,
+                                                            output_file)
         
-        # stream output in real-time (for pv progress)
         if has_pv:
-            for line in process.stdout:
-                print(f"      {line}", end='', flush=True)
-        
-        # wait for completion
-        return_code = process.wait()
-        
-        if return_code != 0:
-            print(f"\nError: AWK command failed with return code {return_code}")
-            sys.exit(1)
+            print(f"\n      Progress (% data processed, time elapsed, rate):")
+        else:
+            print(f"\n      Note: Install 'pv' for progress bar (conda install pv or apt install pv)")
+            print(f"      Processing... (this may take a few moments)")
+    
+    try:
+        if is_identity:
+            copy_file(input_file, output_file)
+        elif engine == 'python':
+            write_header(header_line, columns_to_keep, output_file)
+            return_code = subset_in_process(columns_to_keep, input_file, output_file)
+            
+            if return_code != 0:
+                print(f"\nError: (de)compression failed with return code {return_code}")
+                sys.exit(1)
+        else:
+            write_header(header_line, columns_to_keep, output_file)
+            
+            # execute the command
+            return_code = run_pipeline(cmd, output_file, has_pv)
+            
+            if return_code != 0:
+                print(f"\nError: AWK command failed with return code {return_code}")
+                sys.exit(1)
         
         # check if output file was created
         if os.path.exists(output_file):
@@ -269,13 +708,20 @@ def subset_beagle(input_file: str, sample_list_file: str, output_file: str,
             sys.exit(1)
             
     except subprocess.CalledProcessError as e:
-        print(f"\nError executing AWK command:")
-        print(f"Command: {' '.join(cmd)}")
-        print(f"Error: {e.stderr}")
+        print(f"\nError executing command:")
+        if cmd:
+            print(f"Command: {' | '.join(shlex.join(stage) for stage in cmd)}")
+        else:
+            print(f"Command: {shlex.join(e.cmd)}")
+        if e.stderr:
+            print(f"Error: {e.stderr}")
         sys.exit(1)
     except Exception as e:
         print(f"\nUnexpected error: {e}")
         sys.exit(1)
+    finally:
+        if awk_script_file:
+            os.unlink(awk_script_file)
 
 def main():
     """Main function with argument parsing"""
@@ -294,17 +740,18 @@ Examples:
   subset_beagle --input input.beagle.gz --keep keep.txt --out output.beagle
 
 Notes:
-  - Input and output can be .beagle or .beagle.gz
+  - Input can be .beagle or .beagle.gz, output .beagle, .beagle.gz or .beagle.zst
   - Sample list should be one sample ID per line, w/o header
   - Must specify either --keep OR --remove
   - AWK streaming provides optimal performance for large files
+  - --drop-third assumes the three likelihoods of each sample sum to 1
         """
     )
     
     parser.add_argument('--input', '-i', required=True,
                        help='Input Beagle file (.beagle or .beagle.gz)')
     parser.add_argument('--out', '-o', required=True,
-                       help='Output Beagle file (.beagle or .beagle.gz)')
+                       help='Output Beagle file (.beagle, .beagle.gz or .beagle.zst)')
     
     # Mutually exclusive group for keep/remove
     group = parser.add_mutually_exclusive_group(required=True)
@@ -313,6 +760,13 @@ Notes:
     group.add_argument('--remove', '-r', metavar='FILE',
                       help='File with sample IDs to remove (one per line)')
     
+    parser.add_argument('--engine', choices=['shell', 'python'], default='shell',
+                       help='Project columns with a cut/AWK pipeline (shell, default) '
+                            'or in-process in Python (python)')
+    parser.add_argument('--drop-third', action='store_true',
+                       help='Write only the first two genotype likelihoods per sample; '
+                            'only valid if P(AA)+P(AB)+P(BB)=1 holds in the input')
+    
     args = parser.parse_args()
     
     # determine mode and sample list file
@@ -324,7 +778,8 @@ Notes:
         remove_mode = True
     
     # run subsetting
-    subset_beagle(args.input, sample_list_file, args.out, remove_mode)
+    subset_beagle(args.input, sample_list_file, args.out, remove_mode, args.engine,
+                  args.drop_third)
 
 if __name__ == "__main__":
     main()